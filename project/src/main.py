@@ -4,8 +4,12 @@ from input_handler import choose_nonlinear_equation, choose_nonlinear_system
 from methods_menu import show_nonlinear_equation_methods, show_nonlinear_system_methods
 
 # Импортируем сами методы
-from methods.nonlinear_equations import chord_method, newton_method, iteration_method as iteration_eq
-from methods.nonlinear_systems import iteration_method as iteration_sys
+from methods.nonlinear_equations import (
+    chord_method, newton_method, iteration_method as iteration_eq, high_precision_newton_method,
+)
+from methods.nonlinear_systems import iteration_method as iteration_sys, anderson_method
+from methods.batch import batch_equation_method, batch_system_method
+from methods.complex_roots import complex_roots_method
 
 # Дополнительные импорты для отрисовки графиков
 import matplotlib.pyplot as plt
@@ -130,6 +134,14 @@ def main():
                 newton_method(selected_equation)
             elif method_choice == '3':
                 iteration_eq(selected_equation)
+            elif method_choice == '4':
+                batch_equation_method(selected_equation)
+            elif method_choice == '5':
+                high_precision_newton_method(selected_equation)
+            elif method_choice == '6':
+                complex_roots_method(selected_equation)
+            elif method_choice == '7':
+                newton_method(selected_equation, deflate=True)
             else:
                 print("Некорректный метод. Возвращаемся в главное меню...\n")
 
@@ -143,7 +155,7 @@ def main():
             # Отрисовываем график выбранной системы
             plot_nonlinear_system(selected_system)
 
-            # Покажем меню выбора метода (для систем - пока один метод)
+            # Покажем меню выбора метода для системы
             method_choice = show_nonlinear_system_methods()
             if method_choice is None:
                 print("Возвращаемся в главное меню...\n")
@@ -152,6 +164,10 @@ def main():
             # Вызываем соответствующий метод
             if method_choice == '1':
                 iteration_sys(selected_system)
+            elif method_choice == '2':
+                anderson_method(selected_system)
+            elif method_choice == '3':
+                batch_system_method(selected_system)
             else:
                 print("Некорректный метод. Возвращаемся в главное меню...\n")
 
@@ -0,0 +1,480 @@
+import time
+import tracemalloc
+
+import mpmath
+import numpy as np
+import sympy
+
+from methods.convergence import (
+    BatchMonitor, STATUS_CONVERGED, STATUS_DOMAIN, STATUS_MAX_ITER, STATUS_MESSAGES, STATUS_RESIDUAL, STATUS_RUNNING,
+    STATUS_SINGULAR, STATUS_STAGNATED,
+)
+from methods.complex_roots import parse_complex_equation
+from methods.domain import domain_mask_function, real_powers
+from methods.nonlinear_systems import parse_system_n
+from methods.result_store import ResultWriter, open_results, store_exists
+
+
+def _lane_array(value, lanes, dtype):
+    """
+    Приводит результат lambdify к массиву длины lanes.
+    Нужно для выражений, которые не зависят от переменных (например, производная 2).
+    """
+    arr = np.asarray(value, dtype=dtype)
+    if arr.shape != (lanes,):
+        arr = np.broadcast_to(arr, (lanes,))
+    return arr
+
+
+def _make_vector_functions(exprs, symbols):
+    """
+    Строит векторизованные F(X) -> (lanes, n) и J(X) -> (lanes, n, n) по символьной системе,
+    а также D(X) -> (lanes,) — маску точек внутри области определения (methods.domain).
+    Корни нечётной степени вычисляются в действительной области (real_powers), как и в D.
+    X — массив формы (lanes, n); тип данных результата совпадает с типом X,
+    поэтому одни и те же функции работают и во float32, и во float64.
+    """
+    n = len(symbols)
+    in_domain = domain_mask_function(symbols, exprs)
+    f_funcs = [sympy.lambdify(symbols, real_powers(expr), 'numpy') for expr in exprs]
+    j_funcs = [[sympy.lambdify(symbols, real_powers(sympy.diff(expr, s)), 'numpy') for s in symbols]
+               for expr in exprs]
+
+    def F(X):
+        lanes = X.shape[0]
+        cols = [X[:, k] for k in range(n)]
+        out = np.empty((lanes, n), dtype=X.dtype)
+        for i, f in enumerate(f_funcs):
+            out[:, i] = _lane_array(f(*cols), lanes, X.dtype)
+        return out
+
+    def J(X):
+        lanes = X.shape[0]
+        cols = [X[:, k] for k in range(n)]
+        out = np.empty((lanes, n, n), dtype=X.dtype)
+        for i, row in enumerate(j_funcs):
+            for k, df in enumerate(row):
+                out[:, i, k] = _lane_array(df(*cols), lanes, X.dtype)
+        return out
+
+    def D(X):
+        return np.broadcast_to(in_domain(*[X[:, k] for k in range(n)]), (X.shape[0],))
+
+    return F, J, D
+
+
+def _newton_step(F, J, X):
+    """
+    Один шаг Ньютона для набора дорожек. Возвращает (dx, residual_norm, singular).
+    Дорожки с вырожденной матрицей Якоби помечаются singular и получают dx = 0.
+    """
+    fx = F(X)
+    jx = J(X)
+    n = X.shape[1]
+    if n == 1:
+        denom = jx[:, 0, 0]
+        singular = ~np.isfinite(denom) | (denom == 0)
+        safe = np.where(singular, 1, denom)
+        dx = (fx[:, 0] / safe)[:, None]
+    else:
+        det = np.linalg.det(jx)
+        singular = ~np.isfinite(det) | (np.abs(det) < np.finfo(X.dtype).tiny)
+        jx[singular] = np.eye(n, dtype=X.dtype)
+        dx = np.linalg.solve(jx, fx[:, :, None])[:, :, 0]
+    dx[singular] = 0
+    return dx, np.linalg.norm(fx, axis=1), singular
+
+
+def _newton_sweep(F, J, D, X, idx, tol, eps, max_iter, max_domain_backtracks=10, status=None, iterations=None):
+    """
+    Векторизованный метод Ньютона по дорожкам idx массива X (изменяется на месте).
+    Работает только с активными дорожками: сошедшиеся, вырожденные, а также
+    отмеченные BatchMonitor (расходимость, колебания, циклы, застой) выбывают.
+
+    Если шаг выводит дорожку из области определения (маска D), её шаг делится
+    пополам, пока точка не вернётся в область (не более max_domain_backtracks раз);
+    проверяются только аргументы ограничений, без вычисления F.
+    Дорожки, стартующие вне области или не вернувшиеся в неё, получают STATUS_DOMAIN.
+    max_iter — общее число итераций или массив с отдельным лимитом для каждой дорожки.
+    status и iterations — необязательные массивы длины idx.size (int8 и int32),
+    в которые записывается результат.
+    Возвращает (status, iterations) для дорожек idx.
+    """
+    if status is None:
+        status = np.empty(idx.size, dtype=np.int8)
+    if iterations is None:
+        iterations = np.empty(idx.size, dtype=np.int32)
+    status[...] = STATUS_MAX_ITER
+    iterations[...] = 0
+    limit = np.broadcast_to(np.asarray(max_iter, dtype=np.int32), idx.shape)
+
+    inside = D(X[idx])
+    status[~inside] = STATUS_DOMAIN
+    active = np.flatnonzero(inside & (limit > 0))
+    monitor = BatchMonitor(active.size, X.shape[1], eps, X.dtype)
+
+    with np.errstate(all='ignore'):
+        for _ in range(int(limit.max(initial=0))):
+            if active.size == 0:
+                break
+            lanes = idx[active]
+            Xa = X[lanes]
+            dx, residual, singular = _newton_step(F, J, Xa)
+
+            X_new = Xa - dx
+            outside = np.flatnonzero(~D(X_new))
+            for _ in range(max_domain_backtracks):
+                if outside.size == 0:
+                    break
+                dx[outside] *= 0.5
+                X_new[outside] = Xa[outside] - dx[outside]
+                outside = outside[~D(X_new[outside])]
+            X_new[outside] = Xa[outside]
+            dx[outside] = 0
+
+            Xa = X_new
+            X[lanes] = Xa
+            iterations[active] += 1
+
+            lane_status = monitor.update(Xa, dx, residual)
+            step = np.max(np.abs(dx), axis=1)
+            done = step < tol(Xa)
+            lane_status[outside] = STATUS_DOMAIN
+            lane_status[singular] = STATUS_SINGULAR
+            done[outside] = False
+            lane_status[done & ~singular & np.all(np.isfinite(Xa), axis=1)] = STATUS_CONVERGED
+            status[active] = np.where(lane_status == STATUS_RUNNING, STATUS_MAX_ITER, lane_status)
+            keep = (lane_status == STATUS_RUNNING) & (iterations[active] < limit[active])
+            if not keep.all():
+                active = active[keep]
+                monitor.compact(keep)
+
+    return status, iterations
+
+
+def _mp_refine(funcs, x_start, eps, dps):
+    """
+    Уточнение одной дорожки средствами mpmath с повышенной точностью.
+    funcs — функции системы, построенные lambdify с модулем 'mpmath'
+    (один раз на весь пакет). Возвращает (root, residual_norm)
+    или (None, inf), если mpmath не сошёлся.
+    """
+    with mpmath.workdps(dps):
+        try:
+            if len(funcs) == 1:
+                root = [mpmath.findroot(funcs[0], mpmath.mpf(x_start[0]))]
+            else:
+                root = list(mpmath.findroot(funcs, [mpmath.mpf(v) for v in x_start]))
+            residual = mpmath.norm([f(*root) for f in funcs])
+        except (ZeroDivisionError, ValueError):
+            return None, np.inf
+    if residual >= eps:
+        return None, float(residual)
+    return np.array([float(v) for v in root]), float(residual)
+
+
+def batch_newton(exprs, symbols, X0, eps, max_iter, refine_iter=5, mp_dps=50, out=None):
+    """
+    Пакетный метод Ньютона со смешанной точностью для уравнения или системы.
+
+    X0 — начальные приближения формы (lanes, n) (для уравнения допускается (lanes,)).
+    Этапы:
+      1) float32: основная масса итераций по всем дорожкам, пока шаг не упрётся
+         в точность float32 или в eps;
+      2) float64: шаги Ньютона только для кандидатов — сошедшихся во float32
+         или застрявших на уровне шума float32; каждая дорожка получает
+         остаток max_iter, но не меньше refine_iter шагов;
+      3) mpmath: дорожки, у которых шаг мал, но ||F|| >= eps в float64
+         (потеря точности), уточняются с mp_dps знаками.
+    Итоговая невязка каждой дорожки проверяется по eps. Расходящиеся,
+    зациклившиеся и т.п. дорожки снимаются с расчёта досрочно (BatchMonitor).
+
+    Начальные приближения лучше передавать сразу во float32: тогда X0
+    не занимает лишней памяти.
+
+    out — необязательный словарь выходных массивов roots, residuals, iterations,
+    status (например, представления ResultWriter.reserve); результаты
+    записываются прямо в них, без промежуточных массивов и копирования.
+
+    Возвращает словарь с массивами roots, residuals, iterations, status
+    (коды из methods.convergence), converged и словарь stats с объёмом
+    памяти и пропускной способностью. Память — реальный пик всех массивов
+    каждого этапа (tracemalloc), включая X0, состояние BatchMonitor
+    и временные массивы итераций.
+    """
+    start_time = time.perf_counter()
+    X0 = np.asarray(X0)
+    if X0.ndim == 1:
+        X0 = X0[:, None]
+    lanes, n = X0.shape
+    F, J, D = _make_vector_functions(exprs, symbols)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    base_bytes = tracemalloc.get_traced_memory()[0] - X0.nbytes
+    tracemalloc.reset_peak()
+
+    if out is None:
+        out = {
+            'roots': np.empty((lanes, n)),
+            'residuals': np.empty(lanes),
+            'iterations': np.empty(lanes, dtype=np.int32),
+            'status': np.empty(lanes, dtype=np.int8),
+        }
+    roots = out['roots'] if out['roots'].ndim == 2 else out['roots'][:, None]
+    residuals = out['residuals']
+    roots[...] = np.nan
+    residuals[...] = np.inf
+
+    # --- Этап 1. float32
+    X32 = X0.astype(np.float32)
+    eps32 = np.finfo(np.float32).eps
+    all_lanes = np.arange(lanes)
+    status, iterations = _newton_sweep(
+        F, J, D, X32, all_lanes,
+        lambda Xa: np.maximum(eps, 8 * eps32 * np.max(np.abs(Xa), axis=1) + 8 * eps32),
+        eps, max_iter, status=out['status'], iterations=out['iterations'])
+    sweep_bytes = tracemalloc.get_traced_memory()[1] - base_bytes
+    tracemalloc.reset_peak()
+
+    # --- Этап 2. float64 только для кандидатов
+    cand = np.flatnonzero((status == STATUS_CONVERGED) | (status == STATUS_STAGNATED))
+    X64 = X32[cand].astype(np.float64)
+    local = np.arange(cand.size)
+    budget = np.maximum(max_iter - iterations[cand], refine_iter)
+    status64, extra = _newton_sweep(F, J, D, X64, local, lambda Xa: np.full(Xa.shape[0], eps), eps, budget)
+    iterations[cand] += extra.astype(iterations.dtype)
+
+    with np.errstate(all='ignore'):
+        if cand.size:
+            res64 = np.linalg.norm(F(X64), axis=1)
+            roots[cand] = X64
+            residuals[cand] = res64
+            status64[res64 < eps] = STATUS_CONVERGED
+            status64[(status64 == STATUS_CONVERGED) & ~(res64 < eps)] = STATUS_RESIDUAL
+            # Застрявшие во float32 дорожки, не сошедшиеся и во float64, сохраняют свой код
+            keep = (status[cand] == STATUS_STAGNATED) & (status64 != STATUS_CONVERGED)
+            status[cand] = np.where(keep, STATUS_STAGNATED, status64)
+    refine_bytes = tracemalloc.get_traced_memory()[1] - base_bytes
+    if not tracing:
+        tracemalloc.stop()
+    converged64 = int(np.count_nonzero(status == STATUS_CONVERGED))
+
+    # --- Этап 3. mpmath для помеченных дорожек
+    flagged = np.flatnonzero(status == STATUS_RESIDUAL)
+    if flagged.size:
+        mp_funcs = [sympy.lambdify(symbols, real_powers(expr), 'mpmath') for expr in exprs]
+    for lane in flagged:
+        root, residual = _mp_refine(mp_funcs, roots[lane], eps, mp_dps)
+        if root is not None:
+            roots[lane] = root
+            residuals[lane] = residual
+            status[lane] = STATUS_CONVERGED
+
+    converged = status == STATUS_CONVERGED
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        'lanes': lanes,
+        'candidates_float32': int(cand.size),
+        'refined_float64': converged64,
+        'refined_mpmath': int(np.count_nonzero(converged)) - converged64,
+        'converged': int(np.count_nonzero(converged)),
+        'sweep_bytes': int(sweep_bytes),
+        'refine_bytes': int(refine_bytes),
+        'peak_bytes': int(max(sweep_bytes, refine_bytes)),
+        'sweep_bytes_per_lane': sweep_bytes / lanes,
+        'refine_bytes_per_lane': refine_bytes / lanes,
+        'seconds': elapsed,
+        'lanes_per_second': lanes / elapsed if elapsed > 0 else float('inf'),
+    }
+
+    return {
+        'roots': out['roots'] if len(symbols) > 1 else out['roots'].reshape(lanes),
+        'residuals': residuals,
+        'iterations': iterations,
+        'status': status,
+        'converged': converged,
+        'stats': stats,
+    }
+
+
+def batch_newton_to_store(exprs, symbols, X0, eps, max_iter, directory, chunk_size=1_000_000, overwrite=False):
+    """
+    Пакетное решение порциями по chunk_size дорожек с записью результатов
+    в колоночное хранилище directory (см. result_store.ResultWriter).
+    batch_newton пишет каждую порцию прямо в зарезервированные срезы хранилища.
+    Пока расчёт идёт, уже записанные порции доступны через open_results.
+    Существующее хранилище перезаписывается только при overwrite=True.
+
+    Возвращает результат в том же формате, что и batch_newton, но массивы
+    читаются из хранилища без копирования, а stats суммируются по порциям
+    (для памяти берётся максимум по порциям).
+    """
+    X0 = np.asarray(X0)
+    if X0.ndim == 1:
+        X0 = X0[:, None]
+    lanes, n = X0.shape
+    writer = ResultWriter(directory, lanes, n, overwrite=overwrite)
+
+    totals = {}
+    for start in range(0, lanes, chunk_size):
+        X_chunk = X0[start:start + chunk_size]
+        views = writer.reserve(len(X_chunk))
+        stats = batch_newton(exprs, symbols, X_chunk, eps, max_iter, out=views)['stats']
+        views['seconds'][...] = stats['seconds'] / stats['lanes']
+        writer.commit()
+        for key, value in stats.items():
+            # Порции решаются по очереди: память — максимум по порциям, а не сумма
+            if key.endswith('_bytes') or key.endswith('_per_lane'):
+                totals[key] = max(totals.get(key, 0), value)
+            elif key != 'lanes_per_second':
+                totals[key] = totals.get(key, 0) + value
+    writer.close()
+
+    totals['lanes_per_second'] = totals['lanes'] / totals['seconds'] if totals['seconds'] > 0 else float('inf')
+    stored = open_results(directory)
+    return {
+        'roots': stored['roots'],
+        'residuals': stored['residuals'],
+        'iterations': stored['iterations'],
+        'status': stored['status'],
+        'converged': stored['status'] == STATUS_CONVERGED,
+        'stats': totals,
+    }
+
+
+def print_batch_report(result):
+    """
+    Выводит сводку пакетного решения: число сошедшихся дорожек, память и скорость.
+    """
+    stats = result['stats']
+    print("\nРезультаты пакетного решения (float32 + уточнение float64):")
+    print(f"Дорожек: {stats['lanes']}, сошлось: {stats['converged']}")
+    print(f"Кандидатов после float32: {stats['candidates_float32']}")
+    print(f"Уточнено во float64: {stats['refined_float64']}, в mpmath: {stats['refined_mpmath']}")
+    print(f"Пик памяти float32-прохода: {stats['sweep_bytes'] / 2 ** 20:.2f} МиБ "
+          f"({stats['sweep_bytes_per_lane']:.0f} байт на дорожку)")
+    print(f"Пик памяти float64-уточнения: {stats['refine_bytes'] / 2 ** 20:.2f} МиБ "
+          f"({stats['refine_bytes_per_lane']:.0f} байт на дорожку)")
+    print(f"Время: {stats['seconds']:.3f} с, {stats['lanes_per_second']:.0f} дорожек/с")
+
+    codes, counts = np.unique(result['status'], return_counts=True)
+    for code, count in zip(codes, counts):
+        if code != STATUS_CONVERGED:
+            print(f"  {STATUS_MESSAGES[int(code)]} Дорожек: {count}")
+
+    converged = result['converged']
+    if np.any(converged):
+        roots = np.round(np.atleast_2d(result['roots'].T).T[converged], 8)
+        unique = np.unique(roots, axis=0)
+        print(f"Различных найденных корней: {len(unique)}")
+        for root in unique[:10]:
+            print("  " + ", ".join(str(v) for v in root))
+
+
+def read_batch_parameters(n):
+    """
+    Считывает параметры пакетного решения: границы области начальных приближений,
+    число дорожек по каждой переменной, eps, max_iter и (необязательно)
+    каталог для сохранения результатов.
+    Формат ввода в файле (одна строка): a b lanes eps max_iter [directory],
+    например: -10 10 1000000 1e-10 50 results
+    Для системы сетка строится в квадрате [a, b]^n.
+    Возвращает (X0, eps, max_iter, directory), directory = None — не сохранять.
+    """
+    mode = input("Введите 'file' для чтения параметров из файла или 'console' для ввода с консоли: ").strip().lower()
+    if mode == 'file':
+        filename = input("Введите название файла с параметрами: ").strip()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                parts = f.readline().split()
+            if len(parts) < 5:
+                raise ValueError("В файле должно быть 5 значений: a, b, lanes, eps, max_iter.")
+            a, b = float(parts[0]), float(parts[1])
+            lanes = int(parts[2])
+            eps = float(parts[3])
+            max_iter = int(parts[4])
+            directory = parts[5] if len(parts) > 5 else None
+        except Exception as e:
+            print(f"Ошибка при чтении файла: {e}")
+            raise
+    else:
+        try:
+            a = float(input("Левая граница области начальных приближений (a): "))
+            b = float(input("Правая граница области начальных приближений (b): "))
+            label = "Число дорожек" if n == 1 else "Число точек сетки по каждой переменной"
+            lanes = int(input(f"{label}: "))
+            eps = float(input("Точность (eps): "))
+            max_iter = int(input("Максимальное число итераций: "))
+            directory = input("Каталог для сохранения результатов (Enter — не сохранять): ").strip() or None
+        except ValueError as e:
+            print(f"Ошибка ввода: {e}")
+            raise
+
+    # Сетка сразу во float32: в этом типе идёт основной проход batch_newton
+    axis = np.linspace(a, b, lanes, dtype=np.float32)
+    grids = np.meshgrid(*([axis] * n), indexing='ij', copy=False)
+    X0 = np.stack([g.ravel() for g in grids], axis=1)
+    return X0, eps, max_iter, directory
+
+
+def _run_batch(exprs, symbols, X0, eps, max_iter, directory):
+    """
+    Запускает пакетное решение в памяти или с записью в хранилище и печатает сводку.
+    """
+    if directory is None:
+        result = batch_newton(exprs, symbols, X0, eps, max_iter)
+    else:
+        overwrite = False
+        if store_exists(directory):
+            answer = input(f"Каталог '{directory}' уже содержит результаты. Перезаписать? (y/n): ")
+            if answer.strip().lower() != 'y':
+                print("Отмена: результаты не сохранены.")
+                return None
+            overwrite = True
+        result = batch_newton_to_store(exprs, symbols, X0, eps, max_iter, directory, overwrite=overwrite)
+    print_batch_report(result)
+    if directory is not None:
+        print(f"Результаты сохранены в каталог: {directory}")
+    return result
+
+
+def batch_equation_method(equation):
+    """
+    Пакетный метод Ньютона со смешанной точностью для нелинейного уравнения:
+    одновременно запускается по множеству начальных приближений на [a, b].
+    """
+    print(f"[Пакетный метод Ньютона] Решаем уравнение: {equation}")
+    try:
+        # 'e' разбирается как основание натурального логарифма ("e^x + x = 0")
+        expr, x = parse_complex_equation(equation)
+    except Exception:
+        return None
+    if expr.free_symbols - {x}:
+        print("Ошибка: уравнение должно зависеть только от x.")
+        return None
+
+    try:
+        X0, eps, max_iter, directory = read_batch_parameters(1)
+    except Exception:
+        return None
+
+    return _run_batch([expr], (x,), X0, eps, max_iter, directory)
+
+
+def batch_system_method(system):
+    """
+    Пакетный метод Ньютона со смешанной точностью для системы нелинейных уравнений:
+    одновременно запускается по сетке начальных приближений.
+    """
+    print(f"[Пакетный метод Ньютона] Решаем систему уравнений: {system}")
+    try:
+        exprs, symbols = parse_system_n(system)
+        X0, eps, max_iter, directory = read_batch_parameters(len(symbols))
+    except Exception as e:
+        print(e)
+        return None
+
+    return _run_batch(exprs, symbols, X0, eps, max_iter, directory)
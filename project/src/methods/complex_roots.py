@@ -0,0 +1,299 @@
+import numpy as np
+import sympy
+
+from methods.convergence import (
+    BatchMonitor, STATUS_CONVERGED, STATUS_MAX_ITER, STATUS_MESSAGES, STATUS_NONFINITE, STATUS_RUNNING,
+    STATUS_SINGULAR, STATUS_STAGNATED,
+)
+
+
+def parse_complex_equation(equation_str):
+    """
+    Преобразует строку уравнения в символьное выражение f(x) = 0.
+    В отличие от parse_equation понимает 'e' как основание натурального логарифма,
+    чтобы уравнения вида "e^x + x = 0" разбирались как exp(x) + x.
+    """
+    eq_str = equation_str.strip().replace('^', '**')
+    if '=' in eq_str:
+        left, right = eq_str.split('=', 1)
+        eq_str = f"({left}) - ({right})"
+
+    x = sympy.symbols('x')
+    try:
+        expr = sympy.sympify(eq_str, locals={'e': sympy.E, 'x': x})
+    except sympy.SympifyError as e:
+        print("Ошибка: не удалось преобразовать уравнение в символьное выражение.", e)
+        raise
+
+    return expr, x
+
+
+def deduplicate_roots(roots, tol):
+    """
+    Объединяет близкие (в пределах tol) комплексные корни.
+    Возвращает (уникальные корни, индекс уникального корня для каждого входного).
+    """
+    unique = []
+    labels = np.empty(roots.size, dtype=np.int64)
+
+    # Грубая группировка округлением, затем слияние соседних групп
+    keys = np.round(np.column_stack([roots.real, roots.imag]) / tol).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    group_label = np.empty(first.size, dtype=np.int64)
+    for group, index in enumerate(first):
+        z = roots[index]
+        for label, u in enumerate(unique):
+            if abs(z - u) <= tol:
+                group_label[group] = label
+                break
+        else:
+            group_label[group] = len(unique)
+            unique.append(z)
+
+    labels[:] = group_label[inverse]
+    return np.array(unique, dtype=complex), labels
+
+
+def complex_newton_grid(expr, x, re_range, im_range, n, eps, max_iter):
+    """
+    Векторизованный комплексный метод Ньютона по сетке n x n начальных приближений
+    в прямоугольнике re_range x im_range комплексной плоскости.
+    Все точки сетки итерируются одновременно; сошедшиеся и отмеченные
+    BatchMonitor (расходимость, циклы, застой, inf/nan) выбывают.
+
+    Возвращает словарь:
+        roots      — найденные уникальные корни;
+        basins     — для каждой точки сетки индекс корня, к которому она сошлась (-1 — не сошлась);
+        status     — код завершения для каждой точки (methods.convergence);
+        iterations — число итераций для каждой точки;
+        stats      — статистика бассейнов: доля сетки и среднее число итераций
+                     для каждого корня (по убыванию доли).
+    """
+    f = sympy.lambdify(x, expr, 'numpy')
+    fprime = sympy.lambdify(x, sympy.diff(expr, x), 'numpy')
+
+    re_axis = np.linspace(re_range[0], re_range[1], n)
+    im_axis = np.linspace(im_range[0], im_range[1], n)
+    Z = (re_axis[None, :] + 1j * im_axis[:, None]).ravel()
+    lanes = Z.size
+
+    status = np.full(lanes, STATUS_MAX_ITER, dtype=np.int8)
+    iterations = np.zeros(lanes, dtype=np.int32)
+    active = np.arange(lanes)
+    monitor = BatchMonitor(lanes, 2, eps)
+
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            z = Z[active]
+            fz = np.broadcast_to(f(z), z.shape)
+            dfz = np.broadcast_to(fprime(z), z.shape)
+            singular = dfz == 0
+            dz = np.where(singular, 0, fz / np.where(singular, 1, dfz))
+            z = z - dz
+            Z[active] = z
+            iterations[active] += 1
+
+            lane_status = monitor.update(
+                np.column_stack([z.real, z.imag]), np.column_stack([dz.real, dz.imag]), np.abs(fz))
+            lane_status[singular] = STATUS_SINGULAR
+            done = (np.abs(dz) < eps * (1 + np.abs(z))) & np.isfinite(z) & ~singular
+            lane_status[done] = STATUS_CONVERGED
+            status[active] = np.where(lane_status == STATUS_RUNNING, STATUS_MAX_ITER, lane_status)
+            keep = lane_status == STATUS_RUNNING
+            if not keep.all():
+                active = active[keep]
+                monitor.compact(keep)
+
+    converged = np.flatnonzero(status == STATUS_CONVERGED)
+    basins = np.full(lanes, -1, dtype=np.int64)
+    roots = np.empty(0, dtype=complex)
+    stats = []
+    if converged.size:
+        tol = max(1e3 * eps, 1e-8) * (1 + np.max(np.abs(Z[converged])))
+        roots, labels = deduplicate_roots(Z[converged], tol)
+        basins[converged] = labels
+        counts = np.bincount(labels, minlength=roots.size)
+        iter_sums = np.bincount(labels, weights=iterations[converged], minlength=roots.size)
+        stats = sorted((
+            {'root': root, 'share': counts[k] / lanes, 'mean_iterations': iter_sums[k] / counts[k]}
+            for k, root in enumerate(roots)
+        ), key=lambda item: -item['share'])
+
+    return {
+        'roots': roots,
+        'basins': basins.reshape(n, n),
+        'status': status.reshape(n, n),
+        'iterations': iterations.reshape(n, n),
+        'stats': stats,
+    }
+
+
+def durand_kerner(coeffs, eps=1e-12, max_iter=500):
+    """
+    Метод Вейерштрасса (Дюрана–Кернера): одновременное нахождение всех корней
+    многочлена с коэффициентами coeffs (от старшей степени к младшей).
+
+    coeffs может быть двумерным массивом (batch, deg + 1): тогда корни целого
+    семейства многочленов одной степени ищутся одним векторизованным проходом.
+    Итерация: z_i <- z_i - p(z_i) / П_{j != i} (z_i - z_j).
+    Начальные приближения — точки (0.4 + 0.9i)^k, масштабированные оценкой
+    модуля корней (граница Фудзивары 2 * max |a_k|^(1/k)). Граница Коши
+    1 + max |a_k| для многочленов степени ~20 слишком велика: произведение
+    разностей переполняется и корни становятся NaN.
+
+    Застой: когда все |p(z_i)| не превышают оценку ошибки округления схемы Горнера
+    (4 * deg * машинный эпсилон * Σ |a_k| |z_i|^k), корни найдены настолько точно,
+    насколько позволяет float64 (например, кратные или плохо обусловленные корни),
+    и дальнейшие итерации лишь перебирают шум; итерации прекращаются.
+
+    Возвращает (roots, iterations, status) с кодами из methods.convergence
+    (STATUS_CONVERGED, STATUS_STAGNATED, STATUS_NONFINITE, STATUS_MAX_ITER);
+    для одного многочлена roots имеет форму (deg,), для семейства — (batch, deg).
+    """
+    coeffs = np.asarray(coeffs, dtype=complex)
+    single = coeffs.ndim == 1
+    coeffs = np.atleast_2d(coeffs)
+    coeffs = coeffs / coeffs[:, :1]
+    batch, deg = coeffs.shape[0], coeffs.shape[1] - 1
+    if deg < 1:
+        raise ValueError("Степень многочлена должна быть не меньше 1.")
+
+    powers = np.abs(coeffs[:, 1:])
+    powers[:, -1] /= 2
+    radius = 2 * np.max(powers ** (1 / np.arange(1, deg + 1)), axis=1)
+    radius[radius == 0] = 1
+    Z = radius[:, None] * (0.4 + 0.9j) ** np.arange(deg)[None, :]
+    status = np.full(batch, STATUS_MAX_ITER, dtype=np.int8)
+    iterations = np.zeros(batch, dtype=np.int32)
+    active = np.arange(batch)
+    eye = np.eye(deg, dtype=bool)
+    noise = 4 * deg * np.finfo(float).eps
+
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            z = Z[active]
+            # Значения многочленов по схеме Горнера для всех корней сразу,
+            # а также Σ |a_k| |z|^k для оценки ошибки округления
+            p = np.zeros_like(z)
+            bound = np.zeros(z.shape)
+            for k in range(deg + 1):
+                p = p * z + coeffs[active, k][:, None]
+                bound = bound * np.abs(z) + np.abs(coeffs[active, k])[:, None]
+            stalled = np.all(np.abs(p) <= noise * bound, axis=1)
+            diff = z[:, :, None] - z[:, None, :]
+            diff[:, eye] = 1
+            dz = p / np.prod(diff, axis=2)
+            z = z - dz
+            Z[active] = z
+            iterations[active] += 1
+
+            done = np.all(np.abs(dz) < eps * (1 + np.abs(z)), axis=1)
+            failed = ~np.all(np.isfinite(z), axis=1)
+            status[active[stalled]] = STATUS_STAGNATED
+            status[active[done]] = STATUS_CONVERGED
+            status[active[failed]] = STATUS_NONFINITE
+            active = active[~(done | failed | stalled)]
+
+    if single:
+        return Z[0], int(iterations[0]), int(status[0])
+    return Z, iterations, status
+
+
+def read_complex_parameters(polynomial):
+    """
+    Считывает параметры комплексного решателя.
+    Для многочлена: eps и max_iter (формат файла: eps max_iter).
+    Иначе: прямоугольник начальных приближений, размер сетки, eps и max_iter
+    (формат файла: re_min re_max im_min im_max n eps max_iter,
+    например: -10 10 -20 20 400 1e-12 50).
+    """
+    mode = input("Введите 'file' для чтения параметров из файла или 'console' для ввода с консоли: ").strip().lower()
+    if mode == 'file':
+        filename = input("Введите название файла с параметрами: ").strip()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                parts = f.readline().split()
+        except Exception as e:
+            print(f"Ошибка при чтении файла: {e}")
+            raise
+        needed = 2 if polynomial else 7
+        if len(parts) < needed:
+            raise ValueError(f"В файле должно быть как минимум {needed} значений.")
+        values = parts[:needed]
+    else:
+        if polynomial:
+            values = [input("Точность (eps): "), input("Максимальное число итераций: ")]
+        else:
+            values = [
+                input("Минимальная действительная часть: "),
+                input("Максимальная действительная часть: "),
+                input("Минимальная мнимая часть: "),
+                input("Максимальная мнимая часть: "),
+                input("Число точек сетки по каждой оси: "),
+                input("Точность (eps): "),
+                input("Максимальное число итераций: "),
+            ]
+
+    if polynomial:
+        return float(values[0]), int(values[1])
+    re_min, re_max, im_min, im_max = (float(v) for v in values[:4])
+    return (re_min, re_max), (im_min, im_max), int(values[4]), float(values[5]), int(values[6])
+
+
+def complex_roots_method(equation):
+    """
+    Поиск комплексных корней уравнения.
+    Для многочленов используется метод Дюрана–Кернера (все корни сразу),
+    для остальных уравнений — комплексный метод Ньютона по сетке начальных
+    приближений со статистикой бассейнов притяжения.
+    """
+    print(f"[Поиск комплексных корней] Решаем уравнение: {equation}")
+
+    try:
+        expr, x = parse_complex_equation(equation)
+    except Exception:
+        return None
+
+    polynomial = expr.is_polynomial(x)
+    try:
+        params = read_complex_parameters(polynomial)
+    except Exception as e:
+        print(f"Ошибка ввода: {e}")
+        return None
+
+    if polynomial:
+        eps, max_iter = params
+        coeffs = [complex(c) for c in sympy.Poly(expr, x).all_coeffs()]
+        roots, iter_count, status = durand_kerner(coeffs, eps, max_iter)
+        print("\nКорни многочлена (метод Дюрана–Кернера):")
+        for root in roots:
+            print(f"  {root}")
+        print(f"Число итераций: {iter_count}")
+        if status == STATUS_STAGNATED:
+            print(STATUS_MESSAGES[status] + " Корни найдены с точностью, "
+                  "предельной для float64 (кратные или плохо обусловленные корни).")
+        elif status != STATUS_CONVERGED:
+            print(STATUS_MESSAGES[status])
+        return roots
+
+    re_range, im_range, n, eps, max_iter = params
+    result = complex_newton_grid(expr, x, re_range, im_range, n, eps, max_iter)
+
+    print(f"\nНайдено различных корней: {len(result['roots'])}")
+    shown = 20
+    for item in result['stats'][:shown]:
+        print(f"  {item['root']}: бассейн {item['share']:.1%} сетки, "
+              f"в среднем {item['mean_iterations']:.1f} итераций")
+    if len(result['stats']) > shown:
+        print(f"  ... и ещё {len(result['stats']) - shown} корней с меньшими бассейнами")
+
+    codes, counts = np.unique(result['status'], return_counts=True)
+    for code, count in zip(codes, counts):
+        if code != STATUS_CONVERGED:
+            print(f"  {STATUS_MESSAGES[int(code)]} Точек: {count}")
+    return result['roots']
@@ -0,0 +1,322 @@
+import math
+
+import numpy as np
+
+# Коды завершения, общие для всех методов (помещаются в int8 для хранилища результатов)
+STATUS_RUNNING = -1
+STATUS_CONVERGED = 0
+STATUS_MAX_ITER = 1
+STATUS_DIVERGED = 2
+STATUS_OSCILLATING = 3
+STATUS_CYCLE = 4
+STATUS_STAGNATED = 5
+STATUS_SINGULAR = 6
+STATUS_NONFINITE = 7
+STATUS_RESIDUAL = 8
+STATUS_DOMAIN = 9
+
+STATUS_MESSAGES = {
+    STATUS_RUNNING: "Итерации продолжаются.",
+    STATUS_CONVERGED: "Сходимость достигнута.",
+    STATUS_MAX_ITER: "Достигнуто максимальное число итераций.",
+    STATUS_DIVERGED: "Итерации расходятся.",
+    STATUS_OSCILLATING: "Итерации колеблются без уменьшения шага.",
+    STATUS_CYCLE: "Итерации зациклились.",
+    STATUS_STAGNATED: "Итерации застряли: невязка перестала уменьшаться.",
+    STATUS_SINGULAR: "Вырожденная производная (матрица Якоби).",
+    STATUS_NONFINITE: "Получено нечисловое значение (inf или nan).",
+    STATUS_RESIDUAL: "Шаг меньше eps, но невязка не меньше eps.",
+    STATUS_DOMAIN: "Точка вне области определения уравнений.",
+}
+
+
+class ConvergenceMonitor:
+    """
+    Отслеживает ход итераций одного решателя и как можно раньше распознаёт
+    расходимость, колебания, циклы и застой.
+
+    После каждого шага вызывается update(x, residual), где residual — норма
+    невязки в новой точке. Метод возвращает STATUS_RUNNING, пока всё в порядке,
+    иначе код причины, по которой итерации стоит прекратить.
+    Проверка сходимости остаётся за самим методом.
+
+    Циклы, колебания и застой признаются только для итераций, которые не сжимаются:
+    пока длина шага или невязка продолжают уменьшаться, итерации не прерываются,
+    даже если сходимость медленная или знакопеременная.
+
+    Параметры:
+        window   — сколько последних шагов учитывается при поиске циклов и колебаний;
+        patience — за сколько шагов невязка должна улучшиться хотя бы на 0.1%
+                   (иначе колебания и шаги на уровне шума считаются застоем);
+        growth   — во сколько раз невязка может превысить лучшую, прежде чем patience шагов
+                   одновременного роста невязки и |x| будут признаны расходимостью;
+        max_abs  — предельный модуль приближения.
+    Застоем считается только отсутствие улучшения при шагах на уровне шума
+    арифметики (порядка 1e3 машинных эпсилон относительно |x|).
+    """
+
+    def __init__(self, eps, window=6, patience=12, growth=1e6, max_abs=1e15):
+        self.eps = eps
+        self.window = window
+        self.patience = patience
+        self.growth = growth
+        self.max_abs = max_abs
+
+        self.points = []
+        self.steps = []
+        self.step_norms = []
+        self.residuals = []
+        self.step_history = []
+        self.best_residual = math.inf
+        self.since_best = 0
+        self.rising = 0
+        self.noise = 1e3 * np.finfo(float).eps
+
+    def rate(self):
+        """
+        Наблюдаемая скорость линейной сходимости: медиана отношений
+        ||Δx_{k+1}|| / ||Δx_k|| по последним шагам (None, если шагов мало).
+        """
+        norms = self.step_norms[-self.window:]
+        ratios = [b / a for a, b in zip(norms, norms[1:]) if a > 0]
+        return float(np.median(ratios)) if ratios else None
+
+    def order(self):
+        """
+        Оценка порядка сходимости по трём последним шагам:
+        p ≈ ln(d_{k+1}/d_k) / ln(d_k/d_{k-1}).
+        """
+        if len(self.step_norms) < 3:
+            return None
+        d0, d1, d2 = self.step_norms[-3:]
+        if min(d0, d1, d2) <= 0 or d1 == d0:
+            return None
+        return math.log(d2 / d1) / math.log(d1 / d0)
+
+    def update(self, x, residual):
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+
+        if not np.all(np.isfinite(x)) or not math.isfinite(residual):
+            return STATUS_NONFINITE
+        if np.max(np.abs(x)) > self.max_abs:
+            return STATUS_DIVERGED
+
+        if self.points:
+            step = x - self.points[-1]
+            self.steps = (self.steps + [step])[-self.window:]
+            self.step_norms = (self.step_norms + [float(np.linalg.norm(step))])[-self.window:]
+        self.points = (self.points + [x])[-(self.window + 1):]
+
+        # Расходимость: patience шагов подряд растут невязка и |x|,
+        # и невязка ушла далеко от лучшей
+        if (self.residuals and residual > self.residuals[-1]
+                and np.max(np.abs(x)) > np.max(np.abs(self.points[-2]))):
+            self.rising += 1
+        else:
+            self.rising = 0
+        if residual < self.best_residual * (1 - 1e-3):
+            self.since_best = 0
+        else:
+            self.since_best += 1
+        self.best_residual = min(self.best_residual, residual)
+        self.residuals = (self.residuals + [residual])[-(self.patience + 1):]
+        if self.rising >= self.patience and residual > self.growth * max(self.best_residual, self.eps):
+            return STATUS_DIVERGED
+
+        if not self.step_norms:
+            return STATUS_RUNNING
+
+        step_norm = self.step_norms[-1]
+        self.step_history = (self.step_history + [step_norm])[-self.patience:]
+        scale = 1 + np.linalg.norm(x)
+
+        # Застой: за patience шагов невязка не улучшилась, а шаги на уровне шума арифметики
+        if (self.since_best >= self.patience and len(self.step_history) == self.patience
+                and max(self.step_history) <= self.noise * scale):
+            return STATUS_STAGNATED
+
+        # Цикл: вернулись в точку, где уже были, хотя шаг не мал
+        # и за период не уменьшились ни шаг, ни невязка.
+        # Допуск берётся от наименьшего шага периода и не больше 1e-3 * (1 + |x|):
+        # большой шаг не должен делать допуск грубым
+        if step_norm > self.eps * scale:
+            for back in range(3, len(self.points)):
+                period = back - 1
+                distance = np.linalg.norm(x - self.points[-back])
+                tol = 1e-3 * min(min(self.step_norms[-period:]), scale)
+                if distance <= tol and not self._contracting(period):
+                    return STATUS_CYCLE
+
+        # Колебания: направление шага меняется на противоположное каждый раз,
+        # шаг не уменьшается, а невязка не улучшалась patience шагов
+        if len(self.steps) >= self.window and self.since_best >= self.patience:
+            flips = all(float(np.dot(a, b)) < 0 for a, b in zip(self.steps, self.steps[1:]))
+            if flips and self.rate() >= 1:
+                return STATUS_OSCILLATING
+
+        return STATUS_RUNNING
+
+    def _contracting(self, span):
+        """
+        True, если за последние span шагов уменьшилась длина шага или невязка.
+        """
+        if len(self.step_norms) <= span or len(self.residuals) <= span:
+            return True
+        return (self.step_norms[-1] < self.step_norms[-1 - span] * (1 - 1e-3)
+                or self.residuals[-1] < self.residuals[-1 - span] * (1 - 1e-3))
+
+
+class BatchMonitor:
+    """
+    Векторизованный аналог ConvergenceMonitor для пакетного режима.
+    Хранит состояние активных дорожек в массивах в порядке активных дорожек
+    и позволяет досрочно снимать с расчёта расходящиеся, колеблющиеся,
+    зациклившиеся и застрявшие дорожки, не давая им определять время всего пакета.
+
+    Все активные дорожки делают шаги одновременно, поэтому номер итерации общий.
+    Когда часть дорожек выбывает, метод compact(keep) сжимает состояние
+    вместе со списком активных дорожек; в остальное время update работает
+    с непрерывными массивами без индексации по номерам дорожек.
+
+    Невязка и расходимость проверяются на каждом шаге; расходимость, как
+    и в ConvergenceMonitor, требует patience шагов одновременного роста
+    невязки и |x|. Циклы с периодом
+    от 2 до cycle_depth шагов и колебания ищутся раз в check_every шагов
+    по кольцевому буферу последних точек формы (cycle_depth + 1, lanes, n).
+    Как и в ConvergenceMonitor, они признаются только для дорожек, у которых
+    шаг не уменьшается и невязка не обновила минимум с прошлой проверки;
+    колебаниями считается чередование направления шага на трёх проверках подряд.
+    Для экономии памяти застой проверяется по контрольным точкам: каждые
+    patience шагов невязка сравнивается со значением в предыдущей контрольной
+    точке, и только если все шаги с тех пор были на уровне шума арифметики
+    dtype (1e3 машинных эпсилон относительно |x|). Дорожки в глобальной фазе
+    метода Ньютона (большие шаги) застрявшими не считаются.
+    """
+
+    def __init__(self, lanes, n, eps, dtype=np.float64, cycle_depth=3, check_every=4,
+                 patience=12, growth=1e6, max_abs=1e15):
+        self.eps = eps
+        self.patience = patience
+        self.growth = growth
+        self.max_abs = max_abs
+        self.cycle_depth = cycle_depth
+        self.check_every = check_every
+        self.noise = 1e3 * np.finfo(dtype).eps
+        self.iteration = 0
+
+        self.best_residual = np.full(lanes, np.inf, dtype=dtype)
+        self.prev_residual = np.full(lanes, np.inf, dtype=dtype)
+        self.checked_residual = np.full(lanes, np.inf, dtype=dtype)
+        self.checkpoint = np.full(lanes, np.inf, dtype=dtype)
+        self.checkpoint_step = np.zeros(lanes, dtype=dtype)
+        self.rising = np.zeros(lanes, dtype=np.int16)
+        self.prev_size = np.full(lanes, np.inf, dtype=dtype)
+        self.flips = np.zeros(lanes, dtype=np.int16)
+        self.history = np.full((cycle_depth + 1, lanes, n), np.nan, dtype=dtype)
+
+    def compact(self, keep):
+        """
+        Оставляет состояние только дорожек keep (булева маска или индексы
+        в текущем порядке активных дорожек).
+        """
+        keep = np.flatnonzero(keep) if keep.dtype == bool else keep
+        for name in ('best_residual', 'prev_residual', 'checked_residual', 'checkpoint',
+                     'checkpoint_step', 'rising', 'prev_size', 'flips'):
+            setattr(self, name, getattr(self, name).take(keep))
+        self.history = self.history.take(keep, axis=1)
+
+    def update(self, X, dx, residual):
+        """
+        Обновляет состояние активных дорожек после шага X_new = X_old - dx.
+        residual — норма невязки в X_old. Возвращает массив кодов
+        (STATUS_RUNNING — продолжать) в порядке активных дорожек.
+        """
+        status = np.full(X.shape[0], STATUS_RUNNING, dtype=np.int8)
+        step = _row_norm(dx)
+        t = self.iteration
+        depth = self.cycle_depth + 1
+
+        with np.errstate(all='ignore'):
+            # rising — сколько шагов подряд растут и невязка, и |x|
+            size = np.abs(X[:, 0]) if X.shape[1] == 1 else np.max(np.abs(X), axis=1)
+            self.rising += 1
+            self.rising *= (residual > self.prev_residual) & (size > self.prev_size)
+            np.minimum(self.best_residual, residual, out=self.best_residual)
+            self.prev_residual = residual
+            self.prev_size = size
+
+            # checkpoint_step — наибольший шаг с предыдущей контрольной точки
+            np.maximum(self.checkpoint_step, step, out=self.checkpoint_step)
+            if t % self.patience == 0:
+                stalled = ((residual >= self.checkpoint * (1 - 1e-3))
+                           & (self.checkpoint_step <= self.noise * (1 + _row_norm(X))))
+                status[stalled] = STATUS_STAGNATED
+                self.checkpoint[:] = residual
+                self.checkpoint_step[:] = 0
+
+            self.history[t % depth] = X
+            if t >= self.cycle_depth and t % self.check_every == 0:
+                self._check_cycles(status, X, step, t)
+
+            # Расходимость: patience шагов подряд растут невязка и |x|,
+            # и невязка ушла далеко от лучшей
+            rising = np.flatnonzero(self.rising >= self.patience)
+            far = residual[rising] > self.growth * np.maximum(self.best_residual[rising], self.eps)
+            status[rising[far]] = STATUS_DIVERGED
+            status[size > self.max_abs] = STATUS_DIVERGED
+            status[~np.isfinite(size)] = STATUS_NONFINITE
+
+        self.iteration += 1
+        return status
+
+    def _check_cycles(self, status, X, step, t):
+        """
+        Проверка циклов и колебаний по последним cycle_depth + 1 точкам.
+        """
+        depth = self.cycle_depth + 1
+        points = [self.history[(t - k) % depth] for k in range(depth)]
+        steps = [points[k] - points[k + 1] for k in range(self.cycle_depth)]
+        norms = [_row_norm(d) for d in steps]
+
+        # Шаг не сжимается, а невязка не обновила минимум с прошлой проверки
+        stuck = ((step >= norms[-1] * (1 - 1e-3))
+                 & (self.best_residual >= self.checked_residual * (1 - 1e-3)))
+        self.checked_residual[:] = self.best_residual
+
+        # Допуск цикла — от наименьшего шага периода и не больше 1e-3 * (1 + |x|)
+        scale = 1 + _row_norm(X)
+        cycle = np.zeros(X.shape[0], dtype=bool)
+        smallest = np.minimum(norms[0], scale)
+        for k in range(2, depth):
+            smallest = np.minimum(smallest, norms[k - 1])
+            cycle |= _row_norm(X - points[k]) <= 1e-3 * smallest
+        cycle &= stuck & (step > self.eps * scale)
+
+        alternating = np.ones(X.shape[0], dtype=bool)
+        for a, b in zip(steps, steps[1:]):
+            alternating &= np.einsum('ij,ij->i', a, b) < 0
+        self.flips = np.where(alternating & stuck, self.flips + 1, 0).astype(np.int16)
+
+        status[self.flips >= 3] = STATUS_OSCILLATING
+        status[cycle] = STATUS_CYCLE
+
+
+def _row_norm(A):
+    """
+    Евклидова норма каждой строки массива формы (lanes, n).
+    """
+    if A.shape[1] == 1:
+        return np.abs(A[:, 0])
+    return np.sqrt(np.einsum('ij,ij->i', A, A))
+
+
+def print_monitor_summary(monitor):
+    """
+    Выводит наблюдаемую скорость и порядок сходимости, если их удалось оценить.
+    """
+    rate = monitor.rate()
+    order = monitor.order()
+    if rate is not None:
+        print(f"Наблюдаемая скорость сходимости ||Δx_(k+1)|| / ||Δx_k||: {rate:.3g}")
+    if order is not None:
+        print(f"Оценка порядка сходимости: {order:.3g}")
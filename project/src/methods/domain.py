@@ -0,0 +1,139 @@
+import numpy as np
+import sympy
+
+# Виды ограничений на аргумент: имя -> проверка над массивом значений аргумента
+CHECKS = {
+    'positive': lambda v: v > 0,
+    'nonnegative': lambda v: v >= 0,
+    'nonzero': lambda v: v != 0,
+    'unit_interval': lambda v: np.abs(v) <= 1,
+    'open_unit_interval': lambda v: np.abs(v) < 1,
+    'at_least_one': lambda v: v >= 1,
+}
+
+
+def _power_constraint(exponent):
+    """
+    Ограничение на основание степени base**exponent в действительной области.
+    """
+    if exponent.is_integer:
+        return 'nonzero' if exponent.is_negative else None
+    if exponent.is_Rational:
+        # Корень нечётной степени определён и для отрицательных чисел
+        if exponent.q % 2 == 1:
+            return 'nonzero' if exponent.is_negative else None
+        return 'positive' if exponent.is_negative else 'nonnegative'
+    # Нецелый показатель общего вида: действительная степень только от положительного числа
+    return 'positive'
+
+
+def _is_odd_root(node):
+    return (node.is_Pow and node.exp.is_Rational and not node.exp.is_integer and node.exp.q % 2 == 1
+            and not node.base.is_number and not node.base.is_nonnegative)
+
+
+def _real_odd_root(node):
+    base, exponent = node.args
+    magnitude = sympy.Abs(base) ** exponent
+    return sympy.sign(base) * magnitude if exponent.p % 2 else magnitude
+
+
+def real_powers(expr):
+    """
+    Заменяет степени с нечётным знаменателем показателя их действительными значениями:
+        x**(1/3) -> sign(x) * |x|**(1/3),   x**(2/3) -> |x|**(2/3).
+    numpy вычисляет (-8.)**(1/3) как NaN, а по domain_constraints такие степени
+    определены и для отрицательного основания; после замены вычисление
+    совпадает с выведенной областью определения.
+    """
+    return expr.replace(_is_odd_root, _real_odd_root)
+
+
+def domain_constraints(expr):
+    """
+    Выводит ограничения области определения выражения по дереву SymPy.
+    Возвращает список пар (вид ограничения из CHECKS, выражение-аргумент), например:
+        ln(x)       -> [('positive', x)]
+        sqrt(1 - x) -> [('nonnegative', 1 - x)]
+        1 / y       -> [('nonzero', y)]
+    Повторяющиеся ограничения объединяются.
+    """
+    constraints = []
+    for node in sympy.preorder_traversal(expr):
+        if isinstance(node, sympy.log):
+            constraints.append(('positive', node.args[0]))
+        elif isinstance(node, sympy.Pow):
+            base, exponent = node.args
+            if base.is_number:
+                continue
+            kind = _power_constraint(exponent)
+            if kind is not None:
+                constraints.append((kind, base))
+        elif isinstance(node, (sympy.asin, sympy.acos)):
+            constraints.append(('unit_interval', node.args[0]))
+        elif isinstance(node, sympy.atanh):
+            constraints.append(('open_unit_interval', node.args[0]))
+        elif isinstance(node, sympy.acosh):
+            constraints.append(('at_least_one', node.args[0]))
+        elif isinstance(node, sympy.tan):
+            constraints.append(('nonzero', sympy.cos(node.args[0])))
+        elif isinstance(node, sympy.cot):
+            constraints.append(('nonzero', sympy.sin(node.args[0])))
+
+    unique = []
+    for item in constraints:
+        if item not in unique:
+            unique.append(item)
+    return unique
+
+
+def domain_mask_function(symbols, exprs):
+    """
+    Строит функцию valid(*args) -> bool-массив: True там, где все выражения exprs
+    определены. Вычисляются только аргументы ограничений, без самих выражений,
+    поэтому проверка дешевле полного вычисления системы.
+    """
+    constraints = []
+    for expr in exprs:
+        for item in domain_constraints(expr):
+            if item not in constraints:
+                constraints.append(item)
+    checks = [(CHECKS[kind], sympy.lambdify(symbols, real_powers(arg), 'numpy')) for kind, arg in constraints]
+
+    def valid(*args):
+        shape = np.broadcast(*args).shape if args else ()
+        mask = np.ones(shape, dtype=bool)
+        with np.errstate(all='ignore'):
+            for check, arg in checks:
+                mask &= check(np.asarray(arg(*args), dtype=float))
+        return mask
+
+    return valid
+
+
+def masked_lambdify(symbols, exprs):
+    """
+    Аналог sympy.lambdify(symbols, exprs, 'numpy') без исключений вне области определения.
+
+    Возвращает функцию evaluate(*args) -> (values, valid):
+        values — массив формы (len(exprs),) + форма аргументов; там, где точка
+                 вне области определения (или результат не конечен), стоит NaN;
+        valid  — bool-массив формы аргументов.
+    Аргументы могут быть как числами, так и массивами (векторизованное вычисление).
+    Корни нечётной степени вычисляются в действительной области (см. real_powers).
+    """
+    funcs = [sympy.lambdify(symbols, real_powers(expr), 'numpy') for expr in exprs]
+    in_domain = domain_mask_function(symbols, exprs)
+
+    def evaluate(*args):
+        args = [np.asarray(a, dtype=float) for a in args]
+        valid = in_domain(*args)
+        values = np.empty((len(funcs),) + valid.shape)
+        with np.errstate(all='ignore'):
+            for i, f in enumerate(funcs):
+                values[i] = f(*args)
+        valid &= np.all(np.isfinite(values), axis=0)
+        values[:, ~valid] = np.nan
+        return values, valid
+
+    return evaluate
@@ -1,5 +1,13 @@
 import sympy
 import math
+import mpmath
+
+from methods.convergence import (
+    ConvergenceMonitor, STATUS_CONVERGED, STATUS_MAX_ITER, STATUS_MESSAGES, STATUS_RUNNING, STATUS_SINGULAR,
+    print_monitor_summary,
+)
+from methods.complex_roots import parse_complex_equation
+
 
 def chord_method(equation):
     """
@@ -97,6 +105,8 @@ def chord_method(equation):
     # Фиксируем "якорь" в точке a, начинаем итерации с x0 = b
     x_cur = b
     iter_count = 0
+    monitor = ConvergenceMonitor(eps)
+    status = STATUS_MAX_ITER
 
     # Чтобы избежать деления на 0, проверяем, что f(a) != f(x_cur)
     if abs(fa - fb) < 1e-15:
@@ -106,6 +116,12 @@ def chord_method(equation):
     for i in range(max_iter):
         # x_{n+1} = x_n - f(x_n)*(x_n - a)/(f(x_n) - f(a))
         fx_cur = f(x_cur)
+
+        # Раннее распознавание расходимости, циклов и застоя
+        status = monitor.update(x_cur, abs(fx_cur))
+        if status != STATUS_RUNNING:
+            break
+
         denom = (fx_cur - fa)
         if abs(denom) < 1e-15:
             print("Деление на 0 или близко к тому, метод хорд не применим.")
@@ -115,28 +131,148 @@ def chord_method(equation):
 
         if abs(x_next - x_cur) < eps:
             # Считаем, что достигли нужной точности
-            root = x_next
+            x_cur = x_next
             iter_count = i + 1
+            status = STATUS_CONVERGED
             break
 
         x_cur = x_next
         iter_count = i + 1
 
     else:
-        # Если цикл for завершился без break, берём текущее x_cur
-        root = x_cur
+        status = STATUS_MAX_ITER
+
+    # Если сходимость не достигнута, берём текущее x_cur
+    root = x_cur
 
     # --- Шаг 6. Выводим результат
+    print(STATUS_MESSAGES[status])
     print(f"\nНайденный корень: {root}")
     print(f"Количество итераций: {iter_count}")
     print(f"Значение f(root): {f(root)}")
+    print_monitor_summary(monitor)
+
+# Уже найденные корни (корень, кратность) по каждому уравнению: метод Ньютона
+# с дефляцией исключает их при повторном решении того же уравнения
+KNOWN_ROOTS = {}
+
+
+def clear_known_roots(equation=None):
+    """
+    Очищает список найденных корней для уравнения equation
+    или для всех уравнений, если equation не задано.
+    """
+    if equation is None:
+        KNOWN_ROOTS.clear()
+    else:
+        KNOWN_ROOTS.pop(equation, None)
+
+
+def modified_newton_solve(f, fprime, fsecond, x0, eps, max_iter, known_roots=(), monitor=None):
+    """
+    Модифицированный метод Ньютона x_{n+1} = x_n - m * f(x_n) / f'(x_n)
+    с автоматической оценкой кратности корня m.
+
+    Используется логарифмическая производная L = f'/f и L' = f''/f - L^2:
+    для корня кратности m L ≈ m / (x - r), L' ≈ -m / (x - r)^2, т.е. m ≈ L^2 / (-L').
+    Вдали от корней эта оценка описывает поведение f на бесконечности
+    (для x^20 - 1 при x = 10 она даёт 20), поэтому кратность переключается
+    только при локальных признаках кратного корня:
+      - округлённая оценка совпала на двух шагах подряд;
+      - отношение соседних шагов обычного Ньютона близко к (m - 1) / m,
+        как при линейной сходимости к корню кратности m;
+      - шаг мал по сравнению с 1 + |x|.
+    После подтверждённого модифицированного шага кратность уточняется по оценке
+    m ≈ L^2 / (-L') без этих условий.
+    Модифицированный шаг отменяется, если в новой точке |f| не уменьшилось,
+    f' = 0 или следующий шаг Ньютона не стал намного (в 10 раз) короче
+    сделанного, как должно быть при квадратичной сходимости; обычно это
+    разворот назад или перелёт. После отмены используется обычный метод
+    Ньютона (m = 1), пока его шаг не уменьшится в 10 раз.
+
+    known_roots — список пар (корень, кратность), которые исключаются дефляцией
+    f(x) / П(x - r_i)^m_i; в терминах L это L - Σ m_i / (x - r_i).
+    f, fprime и fsecond — числовые функции одного аргумента.
+
+    Возвращает (x, iter_count, m, status), status — код из methods.convergence.
+    """
+    if monitor is None:
+        monitor = ConvergenceMonitor(eps)
 
-def newton_method(equation: str):
+    def log_derivative(point, f_val):
+        L = fprime(point) / f_val
+        dL = fsecond(point) / f_val - L * L
+        for root, multiplicity in known_roots:
+            L -= multiplicity / (point - root)
+            dL += multiplicity / (point - root) ** 2
+        return L, dL
+
+    xn = x0
+    m = 1
+    m_prev = None
+    locked_step = None  # шаг Ньютона при отмене: до его уменьшения в 10 раз m = 1
+    prev = None         # (x, f, L, dL, шаг Ньютона, сделанный шаг) предыдущей итерации
+    for i in range(max_iter):
+        f_val = f(xn)
+        if f_val == 0:
+            return xn, i, m, STATUS_CONVERGED
+        if any(xn == root for root, _ in known_roots):
+            return xn, i, m, STATUS_SINGULAR
+        L, dL = log_derivative(xn, f_val)
+
+        # Защита: отменяем модифицированный шаг, не подтверждённый в новой точке
+        if m > 1:
+            f_old, step_old = prev[1], prev[5]
+            if L == 0 or abs(f_val) >= abs(f_old) or abs(1 / L) > 0.1 * abs(step_old):
+                xn, f_val, L, dL = prev[:4]
+                m = 1
+                m_prev = None
+                locked_step = abs(prev[4])
+
+        # Раннее распознавание расходимости, циклов и застоя
+        status = monitor.update(xn, abs(f_val))
+        if status != STATUS_RUNNING:
+            return xn, i, m, status
+
+        if L == 0:
+            return xn, i, m, STATUS_SINGULAR
+        newton_step = 1 / L
+        if locked_step is not None and abs(newton_step) < 0.1 * locked_step:
+            locked_step = None
+
+        # Оценка кратности и переход к модифицированному шагу
+        if locked_step is None and dL < 0:
+            m_est = round(L * L / -dL)
+            if m > 1 and m_est >= 1 and m_est == m_prev:
+                # Модифицированный шаг уже подтверждён: точка рядом с корнем, оценка надёжна
+                m = m_est
+            elif m_est >= 2 and m_est == m_prev and prev is not None:
+                ratio = newton_step / prev[4]
+                local = (0 < ratio < 1 and abs(ratio - (m_est - 1) / m_est) < 0.1 / m_est
+                         and abs(newton_step) < 0.1 * (1 + abs(xn)))
+                if local:
+                    m = m_est
+            m_prev = m_est
+
+        step = m * newton_step
+        xn_next = xn - step
+
+        if abs(step) < eps:
+            return xn_next, i + 1, m, STATUS_CONVERGED
+
+        prev = (xn, f_val, L, dL, newton_step, step)
+        xn = xn_next
+
+    return xn, max_iter, m, STATUS_MAX_ITER
+
+
+def newton_method(equation: str, deflate=False):
     """
     Метод Ньютона для нахождения корня нелинейного уравнения.
 
     Параметры:
         equation (str): Строка с уравнением, например "x^2 - 5 = 0".
+        deflate (bool): Исключать дефляцией корни, найденные ранее.
 
     Внутри функции запрашивается у пользователя:
         - начальное приближение x0,
@@ -144,6 +280,15 @@ def newton_method(equation: str):
         - максимальное количество итераций max_iter.
 
     Пользователь выбирает способ ввода параметров: из файла или с консоли.
+
+    Кратность корня оценивается автоматически, и на кратных корнях метод
+    переходит к модифицированному шагу x - m f/f' (см. modified_newton_solve).
+    При deflate=True найденные корни запоминаются в KNOWN_ROOTS и при повторном
+    решении того же уравнения исключаются дефляцией; перед решением
+    предлагается очистить этот список.
+
+    Возвращает (корень, число итераций, код завершения из methods.convergence)
+    или None при ошибке ввода.
     """
 
     print(f"[Метод Ньютона] Решаем уравнение: {equation}")
@@ -184,46 +329,184 @@ def newton_method(equation: str):
         print("Неверный режим ввода параметров.")
         return None
 
-    # --- Подготовка символьного выражения
-    eq = equation.replace("^", "**")
-    if "=" in eq:
-        left, right = eq.split("=")
-        eq = f"({left}) - ({right})"
-
-    x = sympy.symbols('x')
-
-    allowed_locals = {
-        "sin": sympy.sin, "cos": sympy.cos, "tan": sympy.tan,
-        "exp": sympy.exp, "E": sympy.E, "sqrt": sympy.sqrt, "pi": sympy.pi
-    }
-
+    # --- Подготовка символьного выражения ('e' — основание натурального логарифма)
     try:
-        f = sympy.sympify(eq, locals=allowed_locals)
-    except Exception as e:
-        print("Ошибка при разборе уравнения:", e)
+        f, x = parse_complex_equation(equation)
+    except Exception:
+        return None
+    if f.free_symbols - {x}:
+        print("Ошибка: уравнение должно зависеть только от x.")
         return None
 
     fprime = sympy.diff(f, x)
+    fsecond = sympy.diff(fprime, x)
+
+    f_num = sympy.lambdify(x, f, 'math')
+    fprime_num = sympy.lambdify(x, fprime, 'math')
+    fsecond_num = sympy.lambdify(x, fsecond, 'math')
+
+    known_roots = []
+    if deflate:
+        if KNOWN_ROOTS.get(equation):
+            print("Известные корни (исключаются дефляцией): "
+                  + ", ".join(f"{root} (кратность {m})" for root, m in KNOWN_ROOTS[equation]))
+            if input("Очистить список найденных корней? (y/n): ").strip().lower() == 'y':
+                clear_known_roots(equation)
+        known_roots = KNOWN_ROOTS.setdefault(equation, [])
+
+        # Для многочлена число вещественных корней известно заранее
+        if known_roots and f.is_polynomial(x):
+            real_count = sympy.Poly(f, x).count_roots()
+            if sum(m for _, m in known_roots) >= real_count:
+                print("Все вещественные корни уравнения уже найдены.")
+                return None
+
+    monitor = ConvergenceMonitor(tol)
+    try:
+        root, iter_count, m, status = modified_newton_solve(
+            f_num, fprime_num, fsecond_num, x0, tol, max_iter, known_roots, monitor)
+    except (ValueError, OverflowError, ZeroDivisionError, TypeError) as e:
+        print(f"Ошибка при вычислении функции: {e}")
+        return None
 
-    xn = x0
-    for i in range(max_iter):
-        f_val = f.subs(x, xn)
-        fprime_val = fprime.subs(x, xn)
+    if status == STATUS_CONVERGED:
+        print(f"Найденный корень: {root} за {iter_count} итераций.")
+        print(f"Оценка кратности корня: {m}")
+        if deflate and all(abs(root - r) > tol for r, _ in known_roots):
+            known_roots.append((root, m))
+    elif status == STATUS_MAX_ITER:
+        print(f"Приближённый корень после {max_iter} итераций: {root}.")
+    else:
+        print(f"{STATUS_MESSAGES[status]} Приближение после {iter_count} итераций: {root}.")
+    if deflate and known_roots and status != STATUS_CONVERGED:
+        print("После исключения найденных корней других корней вблизи x0 не найдено; "
+              "возможно, все вещественные корни уже найдены.")
+    print_monitor_summary(monitor)
+    return root, iter_count, status
+
+def progressive_precision_newton(expr, x, x0, digits, eps=1e-12, max_iter=100, known_roots=()):
+    """
+    Нахождение корня expr = 0 с digits верными знаками.
+
+    Сначала корень находится обычной арифметикой float64 (modified_newton_solve).
+    Затем точность mpmath удваивается на каждом шаге Ньютона: 15 -> 30 -> 60 -> ...,
+    так как при квадратичной сходимости каждый шаг удваивает число верных знаков.
+    Поэтому почти вся работа делается с малой точностью, а с итоговой —
+    только последний шаг и контрольный шаг.
+
+    Для корня кратности m вычисленное значение f различает лишь 1/m часть знаков,
+    поэтому рабочая точность увеличивается в m раз.
+
+    Возвращает (корень mpmath.mpf, число шагов float64, список точностей mpmath,
+    оценка погрешности |Δx| на итоговой точности, кратность m, f_vanished)
+    или None, если float64-этап не сошёлся. Если в контрольном шаге f
+    обращается в 0 на итоговой точности (f_vanished = True), поправка равна
+    нулю и ничего не говорит о погрешности: тогда оценкой служит |Δx|
+    последнего ненулевого шага (0, если f обращалась в 0 уже в float64-корне).
+    """
+    f = sympy.lambdify(x, expr, 'math')
+    fprime = sympy.lambdify(x, sympy.diff(expr, x), 'math')
+    fsecond = sympy.lambdify(x, sympy.diff(expr, x, 2), 'math')
 
-        if fprime_val == 0:
-            print("Нулевая производная. Метод Ньютона не применим.")
-            return None
+    root, iter_count, m, status = modified_newton_solve(f, fprime, fsecond, x0, eps, max_iter, known_roots)
+    if status != STATUS_CONVERGED:
+        print(STATUS_MESSAGES[status])
+        return None
 
-        xn_next = xn - f_val / fprime_val
+    f_mp = sympy.lambdify(x, expr, 'mpmath')
+    fprime_mp = sympy.lambdify(x, sympy.diff(expr, x), 'mpmath')
+
+    def newton_correction(point):
+        # f(point) == 0: корень точен на текущей точности, поправка не нужна
+        f_val = f_mp(point)
+        return f_val if f_val == 0 else m * f_val / fprime_mp(point)
+
+    guard = 10
+    target_dps = (digits + guard) * m
+    dps = 15
+    dps_history = []
+    xn = mpmath.mpf(root)
+    last_step = mpmath.mpf(0)
+    while dps < target_dps:
+        dps = min(2 * dps, target_dps)
+        dps_history.append(dps)
+        with mpmath.workdps(dps):
+            xn = +xn
+            correction = newton_correction(xn)
+            xn = xn - correction
+            if correction != 0:
+                last_step = abs(correction)
+
+    # Контрольный шаг на итоговой точности оценивает достигнутую погрешность
+    with mpmath.workdps(target_dps):
+        correction = newton_correction(xn)
+        xn = xn - correction
+
+    f_vanished = correction == 0
+    error = last_step if f_vanished else abs(correction)
+    return xn, iter_count, dps_history, error, m, f_vanished
+
+
+def high_precision_newton_method(equation):
+    """
+    Метод Ньютона с прогрессивным повышением точности (mpmath)
+    для нахождения корня с заданным числом верных знаков (например, 50).
+    Запрашивает x0, число знаков digits и max_iter для float64-этапа.
+    Формат файла (одна строка): x0 digits max_iter, например: 2 50 100
+    """
+    print(f"[Метод Ньютона с высокой точностью] Решаем уравнение: {equation}")
 
-        if abs(xn_next - xn) < tol:
-            print(f"Найденный корень: {float(xn_next)} за {i + 1} итераций.")
-            return float(xn_next), i + 1
+    mode = input("Введите 'file' для чтения из файла или 'console' для ввода с консоли: ").strip().lower()
+    try:
+        if mode == 'file':
+            filename = input("Введите название файла с параметрами: ").strip()
+            with open(filename, 'r', encoding='utf-8') as f:
+                parts = f.readline().split()
+            if len(parts) < 3:
+                print("Ошибка: в файле должно быть 3 числа (x0, digits, max_iter).")
+                return None
+            x0, digits, max_iter = float(parts[0]), int(parts[1]), int(parts[2])
+        else:
+            x0 = float(input("Введите начальное приближение (x0): "))
+            digits = int(input("Число верных знаков (digits): "))
+            max_iter = int(input("Максимальное число итераций float64-этапа: "))
+    except FileNotFoundError:
+        print("Ошибка: файл не найден.")
+        return None
+    except ValueError:
+        print("Ошибка: введены некорректные значения.")
+        return None
 
-        xn = xn_next
+    try:
+        # 'e' разбирается как основание натурального логарифма ("e^x + x = 0")
+        expr, x = parse_complex_equation(equation)
+    except Exception:
+        return None
+    if expr.free_symbols - {x}:
+        print("Ошибка: уравнение должно зависеть только от x.")
+        return None
 
-    print(f"Приближённый корень после {max_iter} итераций: {float(xn)}.")
-    return float(xn), max_iter
+    try:
+        result = progressive_precision_newton(expr, x, x0, digits, max_iter=max_iter)
+    except (ValueError, OverflowError, ZeroDivisionError, TypeError) as e:
+        print(f"Ошибка при вычислении функции: {e}")
+        return None
+    if result is None:
+        return None
+
+    root, iter_count, dps_history, error, m, f_vanished = result
+    print(f"Найденный корень: {mpmath.nstr(root, digits)}")
+    print(f"Итераций float64: {iter_count}, шагов mpmath: {len(dps_history)} (точности: {dps_history})")
+    if not f_vanished:
+        print(f"Оценка погрешности: {mpmath.nstr(error, 5)}")
+    elif error > 0:
+        print("f(x) обращается в 0 на рабочей точности, поэтому контрольная поправка равна нулю.")
+        print(f"Оценка погрешности сверху по предыдущему шагу: {mpmath.nstr(error, 5)}")
+    else:
+        print("f(x) обращается в 0 в найденной точке на всех точностях: корень точен в пределах рабочей точности.")
+    if m > 1:
+        print(f"Кратность корня: {m}")
+    return root
 
 
 import sympy
@@ -326,6 +609,7 @@ def iteration_method(equation):
 
     iter_count = 0
     current_x = x0
+    monitor = ConvergenceMonitor(eps)
 
     for i in range(max_iter):
         fx_val = f(current_x)
@@ -335,6 +619,13 @@ def iteration_method(equation):
             print(f"Условие |f(x)| < eps выполнено: |{fx_val}| < {eps}")
             break
 
+        # Раннее распознавание расходимости, колебаний, циклов и застоя
+        status = monitor.update(current_x, abs(fx_val))
+        if status != STATUS_RUNNING:
+            print(f"{STATUS_MESSAGES[status]} x = {current_x}. Прерываем вычисления.")
+            print_monitor_summary(monitor)
+            return
+
         next_x = current_x - alpha * fx_val
 
         # Проверка условия по изменению x
@@ -344,11 +635,6 @@ def iteration_method(equation):
             print(f"Разница между итерациями меньше eps: |{next_x - current_x}| < {eps}")
             break
 
-        # Проверка на возможное расхождение
-        if abs(next_x) > 1e15:
-            print(f"Итерации расходятся (x ~ {next_x}). Прерываем вычисления.")
-            return
-
         current_x = next_x
         iter_count = i + 1
 
@@ -356,4 +642,5 @@ def iteration_method(equation):
     print(f"\nНайденный корень: {current_x}")
     print(f"Количество итераций: {iter_count}")
     if abs(final_fx) < eps:
-        print("Условие |f(x)| < eps выполнено.")
\ No newline at end of file
+        print("Условие |f(x)| < eps выполнено.")
+    print_monitor_summary(monitor)
\ No newline at end of file
@@ -1,5 +1,12 @@
 import sympy
 import math
+import numpy as np
+
+from methods.convergence import (
+    ConvergenceMonitor, STATUS_CONVERGED, STATUS_DOMAIN, STATUS_MAX_ITER, STATUS_MESSAGES, STATUS_RUNNING,
+    print_monitor_summary,
+)
+from methods.domain import masked_lambdify
 
 
 def read_parameters():
@@ -80,6 +87,11 @@ def iteration_method(system):
          x_{n+1} = x_n - alpha * f1(x_n, y_n)
          y_{n+1} = y_n - alpha * f2(x_n, y_n)
     Если предложенный шаг не уменьшает норму F(x,y) = sqrt(f1^2+f2^2), alpha уменьшается (line search).
+    Каждый пробный шаг вычисляется; дробление прекращается, если не улучшил
+    невязку уже шаг короче eps.
+    Пробная точка вне области определения (например, x <= 0 для ln(x))
+    не вызывает исключений: шаг так же уменьшается (masked_lambdify).
+    Расходимость, циклы и застой распознаются заранее (ConvergenceMonitor).
 
     Останавливаемся, если:
       - ||F(x,y)|| < eps,
@@ -101,19 +113,17 @@ def iteration_method(system):
         print(e)
         return
 
-    # Преобразуем символьные выражения в функции f1(x,y) и f2(x,y)
-    f1 = sympy.lambdify((x, y), expr1, 'math')
-    f2 = sympy.lambdify((x, y), expr2, 'math')
+    # Преобразуем символьные выражения в функцию F(x,y) = (f1, f2) с маской области определения
+    evaluate = masked_lambdify((x, y), [expr1, expr2])
 
     current_x, current_y = x0, y0
     iter_count = 0
+    monitor = ConvergenceMonitor(eps)
 
     for i in range(max_iter):
-        try:
-            f_val1 = f1(current_x, current_y)
-            f_val2 = f2(current_x, current_y)
-        except Exception as e:
-            print(f"Ошибка при вычислении функции в точке ({current_x}, {current_y}): {e}")
+        (f_val1, f_val2), valid = evaluate(current_x, current_y)
+        if not valid:
+            print(f"Точка ({current_x}, {current_y}) вне области определения уравнений.")
             return
 
         norm_f = math.sqrt(f_val1 ** 2 + f_val2 ** 2)
@@ -121,6 +131,12 @@ def iteration_method(system):
             print(f"Сходимость по значению функции достигнута: ||F(x,y)|| = {norm_f} < {eps}")
             break
 
+        # Раннее распознавание расходимости, колебаний, циклов и застоя
+        status = monitor.update((current_x, current_y), norm_f)
+        if status != STATUS_RUNNING:
+            print(f"{STATUS_MESSAGES[status]} x = {current_x}, y = {current_y}. Прерывание вычислений.")
+            break
+
         # Адаптивный подбор шага
         alpha_current = alpha
         candidate_found = False
@@ -128,18 +144,15 @@ def iteration_method(system):
         for j in range(max_backtracks):
             candidate_x = current_x - alpha_current * f_val1
             candidate_y = current_y - alpha_current * f_val2
-            try:
-                candidate_f1 = f1(candidate_x, candidate_y)
-                candidate_f2 = f2(candidate_x, candidate_y)
-            except Exception as e:
-                print(f"Ошибка при вычислении функции в кандидате ({candidate_x}, {candidate_y}): {e}")
-                break
+            (candidate_f1, candidate_f2), valid = evaluate(candidate_x, candidate_y)
 
-            norm_candidate = math.sqrt(candidate_f1 ** 2 + candidate_f2 ** 2)
-            if norm_candidate < norm_f:
+            if valid and math.sqrt(candidate_f1 ** 2 + candidate_f2 ** 2) < norm_f:
                 candidate_found = True
                 break
-            # Уменьшаем шаг, если улучшения нет
+            # Шаг короче eps уже не изменит решение заметно — дальше дробить бессмысленно
+            if alpha_current * norm_f < eps:
+                break
+            # Уменьшаем шаг, если улучшения нет или кандидат вне области определения
             alpha_current /= 2
 
         if not candidate_found:
@@ -155,26 +168,229 @@ def iteration_method(system):
             print(f"Сходимость по изменению решения достигнута: ||Δ(x,y)|| = {diff} < {eps}")
             break
 
-        # Проверка на возможную расходимость
-        if abs(current_x) > 1e15 or abs(current_y) > 1e15:
-            print(f"Итерации расходятся: x = {current_x}, y = {current_y}. Прерывание вычислений.")
-            return
-
     else:
         print("Достигнуто максимальное число итераций.")
 
     # Итоговая оценка
-    try:
-        final_f1 = f1(current_x, current_y)
-        final_f2 = f2(current_x, current_y)
-    except Exception as e:
-        print(f"Ошибка при финальном вычислении функций: {e}")
-        return
+    (final_f1, final_f2), _ = evaluate(current_x, current_y)
 
     print("\nРезультаты решения системы методом простых итераций с адаптивным шагом:")
     print(f"Найденное решение: x = {current_x}, y = {current_y}")
     print(f"Число итераций: {iter_count}")
     print(f"||F(x,y)|| = {math.sqrt(final_f1 ** 2 + final_f2 ** 2)}")
+    print_monitor_summary(monitor)
+
+
+def parse_system_n(system):
+    """
+    Обобщение parse_system на систему из N уравнений с N неизвестными.
+    Возвращает список символьных выражений и кортеж переменных,
+    упорядоченных по имени (x, y, z, ...).
+    """
+    if len(system) < 2:
+        raise ValueError("Система должна содержать минимум 2 уравнения.")
+
+    try:
+        exprs = [sympy.sympify(parse_equation(eq)) for eq in system]
+    except sympy.SympifyError as e:
+        raise ValueError("Ошибка: не удалось преобразовать уравнения в символьные выражения.") from e
+
+    symbols = sorted(set().union(*(expr.free_symbols for expr in exprs)), key=str)
+    if len(symbols) != len(exprs):
+        raise ValueError(f"Число неизвестных ({len(symbols)}) не совпадает с числом уравнений ({len(exprs)}).")
+
+    return exprs, tuple(symbols)
+
+
+def read_anderson_parameters(symbols):
+    """
+    Считывает параметры ускорения Андерсона: alpha, depth, eps, max_iter
+    и начальное приближение для каждой из переменных symbols.
+    Формат ввода в файле (одна строка):
+         0.1 5 1e-5 100 0 0
+    где alpha=0.1, depth=5, eps=1e-5, max_iter=100, далее x0, y0, ...
+    """
+    n = len(symbols)
+    mode = input("Введите 'file' для чтения параметров из файла или 'console' для ввода с консоли: ").strip().lower()
+    if mode == 'file':
+        filename = input("Введите название файла с параметрами: ").strip()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                line = f.readline().strip()
+            parts = line.split()
+            if len(parts) < 4 + n:
+                raise ValueError(f"В файле должно быть как минимум {4 + n} значений: alpha, depth, eps, max_iter и {n} начальных приближений.")
+            alpha = float(parts[0])
+            depth = int(parts[1])
+            eps = float(parts[2])
+            max_iter = int(parts[3])
+            x0 = [float(v) for v in parts[4:4 + n]]
+        except Exception as e:
+            print(f"Ошибка при чтении файла: {e}")
+            raise
+    else:
+        try:
+            alpha = float(input("Введите alpha (параметр релаксации): "))
+            depth = int(input("Глубина истории Андерсона (depth): "))
+            eps = float(input("Точность (eps): "))
+            max_iter = int(input("Максимальное число итераций: "))
+            x0 = [float(input(f"Начальное приближение {s}0: ")) for s in symbols]
+        except Exception as e:
+            print(f"Ошибка ввода: {e}")
+            raise
+
+    if depth < 1:
+        raise ValueError("Глубина истории должна быть не меньше 1.")
+
+    return alpha, depth, eps, max_iter, np.array(x0, dtype=float)
+
+
+def anderson_solve(F, x0, alpha, eps, max_iter, depth=5, max_cond=1e10, monitor=None, max_domain_backtracks=30):
+    """
+    Ядро метода простых итераций с ускорением Андерсона (Anderson mixing).
+    Базовое отображение: G(x) = x - alpha * F(x), невязка r = G(x) - x.
+
+    На каждом шаге решается малая задача наименьших квадратов
+         gamma = argmin || r_k - dR * gamma ||,
+    и новое приближение x_{k+1} = G(x_k) - dG * gamma, где столбцы dR и dG —
+    разности последних depth невязок и значений G. История хранится
+    в заранее выделенных массивах (N x depth) как кольцевой буфер.
+
+    Защита (safeguard): история сбрасывается, если норма F не уменьшилась,
+    если матрица dR плохо обусловлена (cond > max_cond) или шаг получился
+    не конечным — тогда делается обычный демпфированный шаг.
+
+    Расходимость, циклы и застой распознаются ConvergenceMonitor.
+
+    Если F вернула NaN в новой точке (вне области определения, см. masked_lambdify),
+    шаг делится пополам в сторону текущего приближения, а история сбрасывается;
+    так делается не более max_domain_backtracks раз, и дробления не считаются
+    итерациями. Сходимость по изменению решения проверяется только для точки,
+    где F конечна, и только для неукороченного шага. Если вернуться в область не удалось, возвращается
+    STATUS_DOMAIN и последнее допустимое приближение.
+
+    F принимает и возвращает numpy-массив длины N.
+    Возвращает (x, iter_count, nfev, status, message), status — код из methods.convergence.
+    Если передан monitor, он используется вместо создаваемого по умолчанию.
+    """
+    x = np.array(x0, dtype=float)
+    n = x.size
+    dG = np.empty((n, depth))
+    dR = np.empty((n, depth))
+    g_prev = np.empty(n)
+    r_prev = np.empty(n)
+    stored = 0      # число заполненных столбцов истории
+    pos = 0         # позиция записи в кольцевом буфере
+    have_prev = False
+    prev_norm = math.inf
+    if monitor is None:
+        monitor = ConvergenceMonitor(eps)
+
+    fx = F(x)
+    nfev = 1
+    norm_f = np.linalg.norm(fx)
+    if not np.isfinite(norm_f):
+        return x, 0, nfev, STATUS_DOMAIN, f"{STATUS_MESSAGES[STATUS_DOMAIN]} x = {x}."
+
+    for i in range(max_iter):
+        if norm_f < eps:
+            return x, i, nfev, STATUS_CONVERGED, f"Сходимость по значению функции достигнута: ||F|| = {norm_f} < {eps}"
+
+        status = monitor.update(x, norm_f)
+        if status != STATUS_RUNNING:
+            return x, i, nfev, status, f"{STATUS_MESSAGES[status]} x = {x}."
+
+        # Перезапуск истории, если ускоренный шаг не уменьшил невязку
+        if stored and norm_f >= prev_norm:
+            stored = pos = 0
+            have_prev = False
+        prev_norm = norm_f
+
+        g = x - alpha * fx
+        r = g - x
+
+        if have_prev:
+            dG[:, pos] = g - g_prev
+            dR[:, pos] = r - r_prev
+            pos = (pos + 1) % depth
+            stored = min(stored + 1, depth)
+        g_prev[:] = g
+        r_prev[:] = r
+        have_prev = True
+
+        x_next = g
+        if stored:
+            gamma, _, _, sv = np.linalg.lstsq(dR[:, :stored], r, rcond=None)
+            candidate = g - dG[:, :stored] @ gamma
+            if sv[-1] > 0 and sv[0] / sv[-1] <= max_cond and np.all(np.isfinite(candidate)):
+                x_next = candidate
+            else:
+                # Плохо обусловленная история: сбрасываем её и делаем обычный шаг
+                stored = pos = 0
+
+        f_next = F(x_next)
+        nfev += 1
+        backtracks = 0
+        while not np.all(np.isfinite(f_next)):
+            if backtracks >= max_domain_backtracks:
+                return x, i, nfev, STATUS_DOMAIN, f"{STATUS_MESSAGES[STATUS_DOMAIN]} Последнее допустимое приближение: x = {x}."
+            # Возвращаемся в область определения, укорачивая шаг
+            x_next = (x + x_next) / 2
+            f_next = F(x_next)
+            nfev += 1
+            backtracks += 1
+            stored = pos = 0
+            have_prev = False
+
+        diff = np.linalg.norm(x_next - x)
+        x, fx = x_next, f_next
+        norm_f = np.linalg.norm(fx)
+        # Укороченный у границы области шаг мал не из-за сходимости
+        if diff < eps and not backtracks:
+            return x, i + 1, nfev, STATUS_CONVERGED, f"Сходимость по изменению решения достигнута: ||Δx|| = {diff} < {eps}"
+
+    if norm_f < eps:
+        return x, max_iter, nfev, STATUS_CONVERGED, f"Сходимость по значению функции достигнута: ||F|| = {norm_f} < {eps}"
+    return x, max_iter, nfev, STATUS_MAX_ITER, STATUS_MESSAGES[STATUS_MAX_ITER]
+
+
+def anderson_method(system):
+    """
+    Решает систему из N нелинейных уравнений методом простых итераций
+    с ускорением Андерсона (см. anderson_solve).
+    В отличие от iteration_method не требует подбора шага дроблением alpha:
+    одно вычисление F на итерацию.
+    """
+    print(f"[Метод простых итераций с ускорением Андерсона] Решаем систему уравнений: {system}")
+
+    try:
+        exprs, symbols = parse_system_n(system)
+    except Exception as e:
+        print(e)
+        return
+
+    try:
+        alpha, depth, eps, max_iter, x0 = read_anderson_parameters(symbols)
+    except Exception:
+        return
+
+    evaluate = masked_lambdify(symbols, exprs)
+
+    def F(v):
+        return evaluate(*v)[0]
+
+    monitor = ConvergenceMonitor(eps)
+    solution, iter_count, nfev, status, message = anderson_solve(F, x0, alpha, eps, max_iter, depth, monitor=monitor)
+    final_norm = np.linalg.norm(F(solution))
+
+    print(message)
+    print("\nРезультаты решения системы методом Андерсона:")
+    label = "Найденное решение" if status == STATUS_CONVERGED else "Последнее приближение"
+    print(f"{label}: " + ", ".join(f"{s} = {v}" for s, v in zip(symbols, solution)))
+    print(f"Число итераций: {iter_count}")
+    print(f"Число вычислений F: {nfev}")
+    print(f"||F|| = {final_norm}")
+    print_monitor_summary(monitor)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,146 @@
+import json
+import os
+
+import numpy as np
+
+META_FILE = 'meta.json'
+
+# Колонки хранилища: имя -> (тип данных, есть ли размерность по неизвестным)
+COLUMNS = {
+    'roots': (np.float64, True),
+    'residuals': (np.float64, False),
+    'iterations': (np.int32, False),
+    'status': (np.int8, False),
+    'seconds': (np.float32, False),
+}
+
+
+def _write_meta(directory, meta):
+    """
+    Атомарно записывает meta.json: сначала во временный файл, затем os.replace.
+    Читатель всегда видит либо старое, либо новое значение count.
+    """
+    path = os.path.join(directory, META_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+
+def store_exists(directory):
+    """
+    True, если в каталоге directory уже есть хранилище результатов.
+    """
+    return os.path.exists(os.path.join(directory, META_FILE))
+
+
+class ResultWriter:
+    """
+    Колоночное хранилище результатов решения в отображаемых в память файлах .npy.
+
+    Для каждой колонки (roots, residuals, iterations, status, seconds) заранее
+    создаётся файл на capacity строк. Запись идёт порциями прямо в отображение:
+    reserve(n) возвращает срезы-представления, которые заполняет вычислитель,
+    commit(n) публикует их для читателей, увеличивая count в meta.json.
+
+    status: код завершения из methods.convergence (0 — решение найдено).
+    seconds: время решения, приходящееся на одну дорожку.
+
+    Существующее хранилище в directory не перезаписывается без overwrite=True
+    (иначе FileExistsError): файлы колонок создаются заново и обрезаются.
+    """
+
+    def __init__(self, directory, capacity, dim=1, overwrite=False):
+        if store_exists(directory) and not overwrite:
+            raise FileExistsError(f"Каталог '{directory}' уже содержит результаты.")
+        self.directory = directory
+        self.capacity = capacity
+        self.dim = dim
+        self.count = 0
+        self._reserved = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.columns = {}
+        for name, (dtype, per_unknown) in COLUMNS.items():
+            shape = (capacity, dim) if per_unknown else (capacity,)
+            self.columns[name] = np.lib.format.open_memmap(
+                os.path.join(directory, f"{name}.npy"), mode='w+', dtype=dtype, shape=shape)
+        self._publish()
+
+    def _publish(self):
+        _write_meta(self.directory, {
+            'capacity': self.capacity,
+            'dim': self.dim,
+            'count': self.count,
+            'columns': list(COLUMNS),
+        })
+
+    def reserve(self, n):
+        """
+        Резервирует следующие n строк и возвращает словарь представлений
+        (без копирования) на соответствующие срезы каждой колонки.
+        """
+        if self.count + n > self.capacity:
+            raise ValueError(f"Хранилище переполнено: {self.count} + {n} > {self.capacity}.")
+        self._reserved = n
+        chunk = slice(self.count, self.count + n)
+        views = {name: column[chunk] for name, column in self.columns.items()}
+        if self.dim == 1:
+            views['roots'] = views['roots'][:, 0]
+        return views
+
+    def commit(self, n=None):
+        """
+        Публикует зарезервированные строки: сбрасывает страницы на диск
+        и обновляет count в meta.json.
+        """
+        n = self._reserved if n is None else n
+        if n > self._reserved:
+            raise ValueError("Нельзя опубликовать больше строк, чем было зарезервировано.")
+        for column in self.columns.values():
+            column.flush()
+        self.count += n
+        self._reserved = 0
+        self._publish()
+
+    def append(self, roots, residuals, iterations, status, seconds):
+        """
+        Дописывает порцию результатов. Данные записываются непосредственно
+        в отображённые файлы, минуя промежуточные буферы.
+        """
+        n = len(residuals)
+        views = self.reserve(n)
+        views['roots'][...] = roots
+        views['residuals'][...] = residuals
+        views['iterations'][...] = iterations
+        views['status'][...] = status
+        views['seconds'][...] = seconds
+        self.commit(n)
+
+    def close(self):
+        """
+        Сбрасывает данные на диск и освобождает отображения.
+        """
+        for column in self.columns.values():
+            column.flush()
+        self.columns = {}
+
+
+def open_results(directory):
+    """
+    Открывает хранилище на чтение без копирования данных.
+    Возвращает словарь колонок (представления длины count поверх np.memmap)
+    и поле 'count'. Можно вызывать повторно во время записи, чтобы увидеть
+    новые опубликованные порции.
+    """
+    with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    count = meta['count']
+    results = {'count': count}
+    for name in meta['columns']:
+        column = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        results[name] = column[:count]
+    if meta['dim'] == 1:
+        results['roots'] = results['roots'][:, 0]
+    return results
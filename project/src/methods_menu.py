@@ -7,6 +7,10 @@ def show_nonlinear_equation_methods():
     print("1) Метод хорд")
     print("2) Метод Ньютона")
     print("3) Метод простых итераций")
+    print("4) Пакетный метод Ньютона (float32 + уточнение float64)")
+    print("5) Метод Ньютона с высокой точностью (mpmath)")
+    print("6) Поиск комплексных корней")
+    print("7) Метод Ньютона с дефляцией найденных корней")
 
     while True:
         choice = input("Введите номер метода (или 'q' для отмены): ").strip()
@@ -15,7 +19,7 @@ def show_nonlinear_equation_methods():
             print("Отмена выбора метода.")
             return None
 
-        if choice in ['1', '2', '3']:
+        if choice in ['1', '2', '3', '4', '5', '6', '7']:
             return choice
         else:
             print("Некорректный ввод. Попробуйте снова.")
@@ -24,11 +28,12 @@ def show_nonlinear_equation_methods():
 def show_nonlinear_system_methods():
     """
     Меню выбора метода решения для системы нелинейных уравнений.
-    В примере оставлен только метод простых итераций (можно расширять).
     Возвращает выбранный метод (строку).
     """
     print("\nВыберите метод решения системы нелинейных уравнений:")
     print("1) Метод простых итераций")
+    print("2) Метод простых итераций с ускорением Андерсона")
+    print("3) Пакетный метод Ньютона (float32 + уточнение float64)")
 
     while True:
         choice = input("Введите номер метода (или 'q' для отмены): ").strip()
@@ -37,7 +42,7 @@ def show_nonlinear_system_methods():
             print("Отмена выбора метода.")
             return None
 
-        if choice == '1':
+        if choice in ['1', '2', '3']:
             return choice
         else:
             print("Некорректный ввод. Попробуйте снова.")